@@ -1,90 +1,301 @@
+import concurrent.futures
+import multiprocessing
 import cv2
 import numpy as np
 import os
+import time
 from torch.utils.tensorboard import SummaryWriter
-import glob
+from tensorboard.compat.proto.event_pb2 import Event
+from tensorboard.compat.proto.summary_pb2 import Summary
 from tqdm import tqdm
 
+try:
+    from numba import njit, prange
 
-def frame_to_scalar_curves(image_path):
-    """Convert a Bad Apple frame to multiple scalar curves based on black-white transitions"""
-    # Load the image
-    img = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+    NUMBA_AVAILABLE = True
+except ImportError:  # numba is optional; NumPy path below still works
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, cache=True)
+    def _scan_transitions(binT, curves, counts):
+        """Per-column transition scan, parallelized across columns.
+
+        Takes the transposed binary image so each image column is a
+        contiguous row in memory and the inner loop never strides."""
+        width, height = binT.shape
+        for x in prange(width):
+            k = 0
+            for y in range(height - 1):
+                if binT[x, y] != binT[x, y + 1]:
+                    curves[x, k] = y
+                    k += 1
+            counts[x] = k
+
+
+FLUSH_EVERY = 100  # Frames between explicit batch flushes of all writers
+
+PREFETCH_CHUNK = 256  # Frames whose bytes are read ahead of the extractors
+
+EXTRACT_BATCH = 32  # Frames thresholded per worker call in one stacked pass
+
+# Pixel coordinates fit in uint16, so curves are stored as uint16 with this
+# sentinel for "no value here" instead of float64 NaN: 4x less memory traffic
+# in the hot logging loop, and the valid check is an integer compare
+CURVE_SENTINEL = np.iinfo(np.uint16).max
+
+# Reorder-buffer marker for a frame whose bytes matched the previous one
+_REUSE_PREVIOUS = object()
+
+_scratch = {}  # Reusable per-shape work arrays for the numba kernel
+
+
+def _scratch_for(shape):
+    if shape not in _scratch:
+        width, height = shape
+        _scratch[shape] = (
+            np.empty((width, height), dtype=np.int16),
+            np.empty(width, dtype=np.int64),
+        )
+    return _scratch[shape]
+
+
+def decode_binary_frame(buf):
+    """Decode JPEG bytes and threshold to binary (Bad Apple is high contrast).
+
+    Callers hold on to the returned image so nothing downstream has to
+    re-read or re-decode the same frame."""
+    img = cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_GRAYSCALE)
     if img is None:
-        raise FileNotFoundError(f"Could not load image: {image_path}")
+        raise ValueError("Could not decode image bytes")
 
-    # Threshold to binary (Bad Apple is high contrast)
     _, binary = cv2.threshold(img, 127, 255, cv2.THRESH_BINARY)
+    return binary
 
-    # Find transitions from black to white or white to black
-    height, width = binary.shape
-    x_sample = np.arange(width)
-    all_curves = {}  # Dictionary to store multiple curves
 
-    for x in range(width):
-        transitions = []
-        # Find transitions in this column
-        for y in range(height - 1):  # -1 because we check y+1
-            current_pixel = binary[y, x]
-            next_pixel = binary[y + 1, x]
+def load_binary_frame(image_path):
+    """Read and decode one frame from disk"""
+    with open(image_path, "rb") as f:
+        return decode_binary_frame(f.read())
 
-            # Check for transition (black to white or white to black)
-            if current_pixel != next_pixel:
-                # Record the y position of the transition
-                transitions.append(y + 0.5)  # Transition happens between pixels
 
-        # Create separate curves for each transition in this column
-        for i, y_pos in enumerate(transitions):
-            curve_name = f"transition_{i}"
-            if curve_name not in all_curves:
-                all_curves[curve_name] = np.full(width, np.nan)
-            all_curves[curve_name][x] = y_pos
+def frame_to_scalar_curves(binary, mode="contours"):
+    """Convert a thresholded Bad Apple frame to multiple scalar curves.
 
-    return x_sample, all_curves
+    mode="contours" traces silhouette outlines with cv2.findContours in one
+    C++ pass over the boundary; mode="transitions" is the original
+    column-by-column black/white transition scan."""
+    width = binary.shape[1]
 
+    if mode == "contours":
+        return _contour_curves(binary, width)
+    return _transition_curves(binary, width)
 
-def log_frame_to_tensorboard(writers, frame_path, frame_number):
-    """Log a single Bad Apple frame as scalar curves to TensorBoard"""
-    try:
-        x_data, all_curves = frame_to_scalar_curves(frame_path)
 
-        # Create unique metric name for this frame
-        metric_name = f"frame_{frame_number:04d}"
+def _contour_curves(binary, width):
+    """One top and one bottom curve per silhouette contour"""
+    # findContours wants the shape as foreground, so invert the binary
+    contours, _ = cv2.findContours(
+        255 - binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE
+    )
 
-        # Log each curve to its own run
-        for curve_name, y_data in all_curves.items():
-            # Get or create writer for this curve
-            if curve_name not in writers:
-                writers[curve_name] = SummaryWriter(f"runs/badapple/{curve_name}")
+    all_curves = {}
+    for ci, contour in enumerate(contours):
+        pts = contour.reshape(-1, 2)
+        xs = pts[:, 0]
+        ys = pts[:, 1].astype(np.uint16)
 
-            writer = writers[curve_name]
+        # Resample the boundary's vertical extent per column; the mask marks
+        # which columns the contour actually touches
+        top = np.full(width, CURVE_SENTINEL, dtype=np.uint16)
+        bottom = np.zeros(width, dtype=np.uint16)
+        mask = np.zeros(width, dtype=np.uint8)
+        np.minimum.at(top, xs, ys)
+        np.maximum.at(bottom, xs, ys)
+        mask[xs] = 1
+        bottom[mask == 0] = CURVE_SENTINEL
 
-            # Log all xy data for this frame as scalars with x as the step
-            for x, y in enumerate(y_data):
-                if not np.isnan(y):  # Only log valid points
-                    writer.add_scalar(metric_name, -y, x)  # x becomes the step!
+        all_curves[f"contour_{ci}_top"] = top
+        all_curves[f"contour_{ci}_bottom"] = bottom
+
+    return all_curves
+
+
+def _transition_curves(binary, width):
+    """Column-by-column black/white transition scan"""
+    all_curves = {}  # Dictionary to store multiple curves
 
-        for curve_name, y_data in all_curves.items():
-            writer = writers[curve_name]
-            for x in x_data:
-                writer.add_scalar(metric_name, 0, x)
+    # Transpose once so every column scan is a contiguous pass over memory
+    # instead of striding across rows for each pixel
+    binT = np.ascontiguousarray(binary.T)
+
+    if NUMBA_AVAILABLE:
+        # Jitted per-column scan, embarrassingly parallel across columns
+        scratch, counts = _scratch_for(binT.shape)
+        _scan_transitions(binT, scratch, counts)
+        max_k = int(counts.max())
+        if max_k == 0:
+            return all_curves
+
+        # Convert the dense int16 matrix to sentinel-padded uint16 curves
+        # outside the jit
+        valid = np.arange(max_k)[None, :] < counts[:, None]
+        curves = (
+            np.where(valid, scratch[:, :max_k], CURVE_SENTINEL)
+            .T.astype(np.uint16)
+        )
+    else:
+        # Transition mask: True wherever pixel (y, x) differs from (y + 1, x);
+        # nonzero on the transposed mask comes out x-major with ys ascending
+        # per column, so no sort is needed
+        transitions = binT[:, :-1] != binT[:, 1:]
+        xs, ys = np.nonzero(transitions)
+
+        if len(xs) == 0:
+            return all_curves
+
+        counts = np.bincount(xs, minlength=width)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        ranks = np.arange(len(xs)) - starts[xs]
+
+        # Scatter into one row per transition index, sentinel where a column
+        # has fewer
+        curves = np.full((counts.max(), width), CURVE_SENTINEL, dtype=np.uint16)
+        curves[ranks, xs] = ys
+
+    for i in range(curves.shape[0]):
+        all_curves[f"transition_{i}"] = curves[i]
+
+    return all_curves
+
+
+def compact_curves(all_curves):
+    """Squeeze sentinel-padded curves into (xs, ys) array pairs.
+
+    The compact form pickles cheaply between worker processes and is
+    exactly what the batched event writer wants."""
+    compact = {}
+    for curve_name, y_data in all_curves.items():
+        valid = y_data != CURVE_SENTINEL
+        xs = np.nonzero(valid)[0].astype(np.int16)
+        ys = y_data[xs].astype(np.float32)
+        compact[curve_name] = (xs, ys)
+    return compact
+
+
+def _read_bytes(path):
+    """Prefetch-stage read; hints the kernel to read ahead sequentially"""
+    with open(path, "rb") as f:
+        if hasattr(os, "posix_fadvise"):  # Not available on Windows/macOS
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        return f.read()
+
+
+def _extract_batch(batch):
+    """Worker: decode a batch of prefetched frames, threshold the whole
+    stack in one vectorized pass, and extract each frame's curves.
+
+    Frames that fail to decode come back as (frame_num, None)."""
+    results = []
+    nums = []
+    grays = []
+    for frame_num, buf in batch:
+        img = cv2.imdecode(np.frombuffer(buf, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            results.append((frame_num, None))
+            continue
+        nums.append(frame_num)
+        grays.append(img)
+
+    if grays:
+        if all(g.shape == grays[0].shape for g in grays):
+            # One SIMD compare over the contiguous stack instead of a
+            # Python -> C crossing per frame
+            binaries = (np.stack(grays) > 127).view(np.uint8) * 255
+        else:  # Mixed frame sizes: threshold one by one
+            binaries = [
+                cv2.threshold(g, 127, 255, cv2.THRESH_BINARY)[1] for g in grays
+            ]
+        for frame_num, binary in zip(nums, binaries):
+            all_curves = frame_to_scalar_curves(binary)
+            results.append((frame_num, compact_curves(all_curves)))
+
+    return results
+
+
+def _make_writer(curve_name):
+    """Writer for one curve's run; flushing is handled on a schedule by the
+    sequence loop, so let the queue build up and the background thread issue
+    large writes"""
+    return SummaryWriter(
+        f"runs/badapple/{curve_name}",
+        max_queue=100000,
+        flush_secs=600,
+    )
+
+
+def log_curves_to_tensorboard(writers, curves, frame_number):
+    """Log one frame's compact curves to TensorBoard"""
+    # Create unique metric name for this frame
+    metric_name = f"frame_{frame_number:04d}"
+
+    # Log each curve to its own run; the writer set is pre-created from a
+    # sample scan, so this branch only fires for curve names the sample missed
+    for curve_name, (xs, ys) in curves.items():
+        if curve_name not in writers:
+            writers[curve_name] = _make_writer(curve_name)
+
+        writer = writers[curve_name]
+
+        # Log all xy data for this frame in one batched pass: build the
+        # protobuf Events directly and hand them to the event file writer,
+        # skipping the per-point add_scalar machinery
+        file_writer = writer._get_file_writer()
+        wall_time = time.time()
+        for x, y in zip(xs.tolist(), ys.tolist()):
+            file_writer.add_event(
+                Event(
+                    wall_time=wall_time,
+                    step=x,  # x becomes the step!
+                    summary=Summary(
+                        value=[Summary.Value(tag=metric_name, simple_value=-y)]
+                    ),
+                )
+            )
 
-            break
 
-        tqdm.write(f"Logged {metric_name} with {len(all_curves)} transition curves")
+def log_frame_to_tensorboard(writers, frame_path, frame_number):
+    """Log a single Bad Apple frame as scalar curves to TensorBoard"""
+    try:
+        # Decode once; the binary image is reused for everything downstream
+        binary = load_binary_frame(frame_path)
+        curves = compact_curves(frame_to_scalar_curves(binary))
+        log_curves_to_tensorboard(writers, curves, frame_number)
 
     except Exception as e:
         print(f"Error processing frame {frame_path}: {e}")
 
 
-def log_badapple_sequence(frames_dir, log_dir="runs/badapple"):
-    """Log entire Bad Apple sequence to TensorBoard"""
+def log_badapple_sequence(frames_dir, log_dir="runs/badapple", workers=None):
+    """Log entire Bad Apple sequence to TensorBoard.
+
+    Decode + extraction fan out over a process pool; the parent process
+    owns all writers and drains results in frame order (via a reorder
+    buffer) so steps stay consistent per tag."""
 
     # Dictionary to hold writers for each curve
     writers = {}
 
-    # Get all frame files
-    frame_files = sorted(glob.glob(os.path.join(frames_dir, "*.jpg")))
+    # Get all frame files; scandir skips the per-entry stat calls glob does,
+    # and the sort key is the actual frame number rather than lexicographic
+    # luck
+    with os.scandir(frames_dir) as entries:
+        frame_files = sorted(
+            (entry.path for entry in entries if entry.name.endswith(".jpg")),
+            key=lambda p: int(p.rsplit("_", 1)[1].split(".")[0]),
+        )
 
     if not frame_files:
         print(f"No .jpg files found in {frames_dir}")
@@ -92,14 +303,116 @@ def log_badapple_sequence(frames_dir, log_dir="runs/badapple"):
 
     print(f"Found {len(frame_files)} frames")
 
-    try:
-        # Process each frame
-        for frame_num, frame_path in enumerate(tqdm(frame_files)):
-            log_frame_to_tensorboard(writers, frame_path, frame_num)
+    if workers is None:
+        workers = os.cpu_count()
+
+    # Pre-create the writer set from a 1%-stride sample of frames so the
+    # burst of per-run filesystem setup happens up front, not lazily spread
+    # through the hot loop
+    sample = frame_files[:: max(1, len(frame_files) // 100)]
+    curve_names = set()
+    for frame_path in sample:
+        try:
+            curve_names.update(frame_to_scalar_curves(load_binary_frame(frame_path)))
+        except Exception as e:
+            # Unreadable sample frames just shrink the sample; the hot
+            # loop tolerates them too, so don't abort the whole run here
+            print(f"Error sampling frame {frame_path}: {e}")
+    for curve_name in sorted(curve_names):
+        writers[curve_name] = _make_writer(curve_name)
+    print(f"Pre-created {len(writers)} writers from a {len(sample)}-frame sample")
+
+    # Fork workers where the platform allows it so they inherit the parent's
+    # already-imported torch/tensorboard instead of re-paying the ~1-2s
+    # import cost per process
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    else:
+        mp_context = None
 
-            # Progress update
-            if (frame_num + 1) % 10 == 0:
-                print(f"Processed {frame_num + 1}/{len(frame_files)} frames")
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=8
+        ) as read_pool, concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=mp_context
+        ) as pool:
+            pending = {}  # Reorder buffer: results arrive out of order
+            next_to_log = 0
+            last_result = None  # Most recently logged curves
+            prev_hash = None  # Hash of the previous frame's raw bytes
+            skipped = 0
+            with tqdm(
+                total=len(frame_files), mininterval=1.0, smoothing=0.1
+            ) as pbar:
+
+                def drain():
+                    """Log whatever is next in frame order"""
+                    nonlocal next_to_log, last_result
+                    while next_to_log in pending:
+                        result = pending.pop(next_to_log)
+                        if result is _REUSE_PREVIOUS:
+                            result = last_result
+                        if result is not None:
+                            log_curves_to_tensorboard(writers, result, next_to_log)
+                            last_result = result
+                        next_to_log += 1
+                        pbar.update(1)
+
+                        # Flush all writers in one batch every FLUSH_EVERY
+                        # frames so the event files hit disk in large writes
+                        if next_to_log % FLUSH_EVERY == 0:
+                            for writer in writers.values():
+                                writer.flush()
+
+                for chunk_start in range(0, len(frame_files), PREFETCH_CHUNK):
+                    chunk = frame_files[chunk_start : chunk_start + PREFETCH_CHUNK]
+
+                    # Prefetch stage: threads read raw bytes off disk in
+                    # parallel; extraction workers only ever see buffers
+                    buffers = list(read_pool.map(_read_bytes, chunk))
+
+                    # Bad Apple has long static stretches; byte-identical
+                    # consecutive frames skip extraction entirely and just
+                    # re-log the previous frame's curves under the new tag
+                    to_extract = []
+                    for i, buf in enumerate(buffers):
+                        frame_num = chunk_start + i
+                        buf_hash = hash(buf)
+                        if buf_hash == prev_hash:
+                            pending[frame_num] = _REUSE_PREVIOUS
+                            skipped += 1
+                        else:
+                            to_extract.append((frame_num, buf))
+                        prev_hash = buf_hash
+                    drain()
+
+                    # Ship frames to the workers in EXTRACT_BATCH groups so
+                    # each call thresholds a whole stack in one pass
+                    futures = {}
+                    for start in range(0, len(to_extract), EXTRACT_BATCH):
+                        batch = to_extract[start : start + EXTRACT_BATCH]
+                        futures[pool.submit(_extract_batch, batch)] = [
+                            frame_num for frame_num, _ in batch
+                        ]
+
+                    for future in concurrent.futures.as_completed(futures):
+                        try:
+                            for frame_num, curves in future.result():
+                                if curves is None:
+                                    print(
+                                        f"Error processing frame {frame_files[frame_num]}: could not decode"
+                                    )
+                                pending[frame_num] = curves
+                        except Exception as e:
+                            for frame_num in futures[future]:
+                                print(
+                                    f"Error processing frame {frame_files[frame_num]}: {e}"
+                                )
+                                pending[frame_num] = None  # Keep the drain moving
+                        drain()
+
+        if skipped:
+            print(f"Skipped extraction for {skipped} unchanged frames")
 
     finally:
         # Close all writers
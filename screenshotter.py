@@ -4,20 +4,165 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.keys import Keys
+from selenium.common.exceptions import TimeoutException
+import base64
+import subprocess
 import time
 import os
+import json
+import urllib.parse
+import urllib.request
 import zipfile
 import argparse
 from datetime import datetime
 from tqdm import tqdm
-import glob
 import concurrent.futures
 import threading
 from queue import Queue
 
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
 # Such vibe coded.
 
 
+class CurvePlotter:
+    """Persistent matplotlib state for rendering scalar curves.
+
+    Building a fresh Figure + Axes per frame costs hundreds of
+    milliseconds; instead keep one Figure and a pool of Line2D artists
+    and just swap their data between frames."""
+
+    def __init__(self, figsize=(19.2, 10.8), dpi=100):
+        self.fig = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot(111)
+        self.lines = []
+
+    def render(self, curve_data, title, path):
+        """Draw a list of (steps, values) pairs and save to path"""
+        # Grow the artist pool on demand; extras are blanked, not removed,
+        # so per-index colors stay stable across frames
+        while len(self.lines) < len(curve_data):
+            (line,) = self.ax.plot([], [], linewidth=2)
+            self.lines.append(line)
+
+        for line, (steps, values) in zip(self.lines, curve_data):
+            line.set_data(steps, values)
+        for line in self.lines[len(curve_data) :]:
+            line.set_data([], [])
+
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.ax.set_title(title)
+        self.fig.savefig(path)
+
+
+class ScalarScrapeCapture:
+    """Render frames straight from TensorBoard's scalar HTTP API.
+
+    Skips the browser stack entirely: each frame's curves are fetched as
+    JSON from /data/plugin/scalars/scalars and drawn with matplotlib's
+    Agg backend, which takes milliseconds per frame instead of a
+    screenshot round-trip through Chrome."""
+
+    def __init__(self, url="http://localhost:6006", max_workers=32):
+        self.url = url.rstrip("/")
+        self.max_workers = max_workers
+        self._local = threading.local()
+
+    def _get_json(self, path):
+        with urllib.request.urlopen(f"{self.url}{path}", timeout=30) as resp:
+            return json.loads(resp.read())
+
+    def _plotter(self):
+        """One persistent CurvePlotter per worker thread"""
+        if not hasattr(self._local, "plotter"):
+            self._local.plotter = CurvePlotter()
+        return self._local.plotter
+
+    def fetch_tag_index(self):
+        """Map each frame tag to the runs that contain it"""
+        tags_by_run = self._get_json("/data/plugin/scalars/tags")
+        index = {}
+        for run, tags in tags_by_run.items():
+            for tag in tags:
+                index.setdefault(tag, []).append(run)
+        return index
+
+    def render_frame(self, tag, runs, screenshot_path):
+        """Fetch one frame's curves and render them to a PNG"""
+        curve_data = []
+        for run in sorted(runs):
+            query = urllib.parse.urlencode(
+                {"run": run, "tag": tag, "format": "json"}
+            )
+            data = self._get_json(f"/data/plugin/scalars/scalars?{query}")
+            # Entries are [wall_time, step, value]
+            steps = [point[1] for point in data]
+            values = [point[2] for point in data]
+            curve_data.append((steps, values))
+
+        self._plotter().render(curve_data, tag, screenshot_path)
+        return screenshot_path
+
+    def capture_frames(self, start_frame=43, max_frame=6571):
+        """Render the whole frame range and compile it into a video"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        frames_dir = "frames_rendered"
+        os.makedirs(frames_dir, exist_ok=True)
+
+        print("Fetching tag index from TensorBoard...")
+        index = self.fetch_tag_index()
+
+        jobs = []
+        for frame_num in range(start_frame, max_frame + 1):
+            padded = str(frame_num).zfill(4)
+            tag = f"frame_{padded}"
+            runs = index.get(tag)
+            if not runs:
+                continue
+            jobs.append((tag, runs, os.path.join(frames_dir, f"frame_{padded}.png")))
+
+        print(f"Rendering {len(jobs)} frames with {self.max_workers} workers")
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers
+        ) as pool:
+            futures = [pool.submit(self.render_frame, *job) for job in jobs]
+            for future in tqdm(
+                concurrent.futures.as_completed(futures),
+                total=len(futures),
+                mininterval=1.0,
+                smoothing=0.1,
+            ):
+                future.result()
+
+        first_frame = int(jobs[0][0].split("_")[1]) if jobs else start_frame
+        # Agg renders the figures at exactly 1920x1080, so no scale filter
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-framerate",
+                "30",
+                "-start_number",
+                str(first_frame),
+                "-i",
+                f"{frames_dir}/frame_%04d.png",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "ultrafast",
+                "-pix_fmt",
+                "yuv420p",
+                f"frames_{timestamp}.mp4",
+            ],
+            check=True,
+        )
+
+        return frames_dir
+
+
 class FrameCapture:
     def __init__(
         self,
@@ -25,19 +170,49 @@ class FrameCapture:
         headless=True,
         window_size="1920,1080",
         max_workers=4,
+        pipe=True,
+        png=False,
+        archive=False,
+        clip=True,
     ):
         self.url = url
         self.headless = headless
         self.window_size = window_size
         self.max_workers = max_workers
+        # Default path: stream frames into ffmpeg stdin, never touching
+        # disk; pipe=False keeps the old write-files-then-compile flow
+        self.pipe = pipe
+        # Everything downstream is re-encoded to H.264 anyway, so JPEG is the
+        # default intermediate; PNG costs a zlib DEFLATE per frame and is
+        # only worth it for lossless archival
+        self.image_format = "png" if png else "jpeg"
+        self.image_ext = "png" if png else "jpg"
+        self.archive = archive  # Zip the frame files after compiling
+        self.clip = clip  # Clip screenshots to the dashboard card
         self.screenshots_taken = 0
+        self._frame_paths = []  # Every screenshot file this capture wrote
         self.lock = threading.Lock()
 
+    def _scale_args(self):
+        """ffmpeg scale filter, only when frames aren't already 1080p.
+
+        Clipped captures are card-sized and any non-default window size
+        changes the frame size too, so both need the scale back up to
+        1080p. Only an unclipped 1920x1080 capture can skip the
+        resample, and even then a crop to even dimensions stays in
+        (yuv420p rejects odd sizes); crop just adjusts strides, unlike
+        a full resample."""
+        if not self.clip and self.window_size == "1920,1080":
+            return ["-vf", "crop=trunc(iw/2)*2:trunc(ih/2)*2"]
+        return ["-vf", "scale=1920:1080"]
+
     def setup_driver(self):
         """Setup Chrome driver with optimal settings"""
         options = Options()
         if self.headless:
-            options.add_argument("--headless")
+            options.add_argument("--headless=new")
+            options.add_argument("--hide-scrollbars")
+            options.add_argument("--mute-audio")
         options.add_argument(f"--window-size={self.window_size}")
         options.add_argument("--disable-web-security")
         options.add_argument("--disable-features=VizDisplayCompositor")
@@ -46,9 +221,106 @@ class FrameCapture:
         options.add_argument("--disable-gpu")
         options.add_argument("--disable-extensions")
         options.add_argument("--disable-plugins")
+        # Trim background work that competes with screenshot compositing
+        options.add_argument("--disable-background-networking")
+        options.add_argument("--disable-sync")
+        options.add_argument("--disable-translate")
+        options.add_argument("--disable-default-apps")
+        # Keep captures pixel-exact regardless of host display scaling
+        options.add_argument("--force-device-scale-factor=1")
 
         return webdriver.Chrome(options=options)
 
+    def cdp_screenshot(self, driver, clip=None):
+        """Grab a screenshot over the DevTools protocol.
+
+        Skips Selenium's classic screenshot path (tab focus handoff plus a
+        JSON base64 round-trip) and returns the raw image bytes."""
+        params = {
+            "format": self.image_format,
+            "fromSurface": True,
+            "captureBeyondViewport": False,
+        }
+        if self.image_format == "jpeg":
+            params["quality"] = 92
+        if clip is not None:
+            params["clip"] = clip
+        result = driver.execute_cdp_cmd("Page.captureScreenshot", params)
+        return base64.b64decode(result["data"])
+
+    @staticmethod
+    def _card_clip(driver):
+        """Compute a CDP clip rect covering the dashboard card.
+
+        The full 1920x1080 viewport is mostly static TensorBoard chrome;
+        clipping the capture to the scalar card makes encode cost scale
+        with the pixels that actually change. ffmpeg scales back up to
+        1080p. Returns None (full viewport) if no card is found."""
+        for selector in ("scalar-card", "card-view", "main"):
+            try:
+                rect = driver.find_element(By.CSS_SELECTOR, selector).rect
+            except Exception:
+                continue
+            if rect["width"] > 0 and rect["height"] > 0:
+                return {
+                    "x": rect["x"],
+                    "y": rect["y"],
+                    "width": rect["width"],
+                    "height": rect["height"],
+                    "scale": 1,
+                }
+        return None
+
+    @staticmethod
+    def _wait_for_filter(driver, value, timeout=2):
+        """Block until the tag filter has actually taken effect.
+
+        Polls (20 ms) for the requested frame tag to show up as a card
+        title in the DOM instead of sleeping a fixed interval — the
+        dashboard usually settles in well under 100 ms. On timeout just
+        screenshot anyway; that's no worse than the old fixed sleep."""
+        try:
+            WebDriverWait(driver, timeout, poll_frequency=0.02).until(
+                lambda d: value in d.find_element(By.TAG_NAME, "body").text
+            )
+        except TimeoutException:
+            pass
+
+    @staticmethod
+    def _write_bytes(path, data):
+        # Single-shot whole-file write; os.open/os.write skips the
+        # buffered file-object layer
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def _pipe_consumer(self, proc, start_frame):
+        """Feed captured frames to ffmpeg stdin in frame order.
+
+        Workers finish frames out of order, so buffer results and only
+        write the next expected frame number; None data means the frame
+        failed and the consumer just skips it."""
+        buffered = {}
+        next_frame = start_frame
+        while True:
+            frame_num, data = self._encode_queue.get()
+            if frame_num is None:  # Capture is done
+                break
+            buffered[frame_num] = data
+            while next_frame in buffered:
+                chunk = buffered.pop(next_frame)
+                if chunk is not None:
+                    proc.stdin.write(chunk)
+                next_frame += 1
+
+        # Flush whatever is left (gaps from failed frames get skipped)
+        for frame_num in sorted(buffered):
+            if buffered[frame_num] is not None:
+                proc.stdin.write(buffered[frame_num])
+        proc.stdin.close()
+
     def capture_single_frame(self, frame_num, frames_dir, screenshot_delay=0.5):
         """Capture a single frame in a separate browser instance"""
         driver = None
@@ -67,31 +339,38 @@ class FrameCapture:
             padded = str(frame_num).zfill(4)
             value = f"frame_{padded}"
 
-            # Clear input and set new value
-            input_element.clear()
-            input_element.send_keys(value)
-
-            # Trigger events
+            # Set the filter in one JS round-trip; clear() fires an
+            # empty-value input event that makes TensorBoard re-render
+            # the full unfiltered tag list before the real filter lands
             driver.execute_script(
                 """
+                arguments[0].value = arguments[1];
                 arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
                 arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
             """,
                 input_element,
+                value,
             )
 
-            # Wait for page to update
-            time.sleep(screenshot_delay)
+            # Wait for the filtered card to appear rather than a fixed sleep
+            self._wait_for_filter(driver, value, timeout=max(2, screenshot_delay))
 
-            # Take screenshot
-            screenshot_path = os.path.join(frames_dir, f"frame_{padded}.png")
-            success = driver.save_screenshot(screenshot_path)
+            # Take screenshot over CDP, clipped to the card
+            screenshot_path = os.path.join(
+                frames_dir, f"frame_{padded}.{self.image_ext}"
+            )
+            self._write_bytes(
+                screenshot_path,
+                self.cdp_screenshot(
+                    driver, clip=self._card_clip(driver) if self.clip else None
+                ),
+            )
 
-            if success:
-                with self.lock:
-                    self.screenshots_taken += 1
+            with self.lock:
+                self.screenshots_taken += 1
+                self._frame_paths.append(screenshot_path)
 
-            return frame_num, success
+            return frame_num, True
 
         except Exception as e:
             print(f"Error capturing frame {frame_num}: {e}")
@@ -101,7 +380,7 @@ class FrameCapture:
             if driver:
                 driver.quit()
 
-    def capture_worker(self, frame_queue, frames_dir, screenshot_delay=0.5):
+    def capture_worker(self, frame_queue, screenshot_delay=0.5):
         """Worker function that processes frames with a persistent browser instance"""
         driver = None
         try:
@@ -116,43 +395,66 @@ class FrameCapture:
                 )
             )
 
+            # Clip rect is computed once, after the first frame's card has
+            # rendered, and reused for every screenshot this worker takes
+            clip = None
+            clip_ready = False
+
             while True:
+                frame_num = None
                 try:
                     frame_num = frame_queue.get(timeout=1)
                     if frame_num is None:  # Poison pill to stop worker
                         break
 
-                    padded = str(frame_num).zfill(4)
-                    value = f"frame_{padded}"
+                    value = self._frame_values[frame_num]
 
-                    # Clear input and set new value
-                    input_element.clear()
-                    input_element.send_keys(value)
-
-                    # Trigger events
+                    # Set the filter value and fire its events in one JS
+                    # round-trip; clear() + send_keys() costs a WebDriver
+                    # command per keystroke
                     driver.execute_script(
                         """
+                        arguments[0].value = arguments[1];
                         arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
                         arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
                     """,
                         input_element,
+                        value,
                     )
 
-                    # Wait for page to update
-                    time.sleep(screenshot_delay)
-
-                    # Take screenshot
-                    screenshot_path = os.path.join(frames_dir, f"frame_{padded}.png")
-                    success = driver.save_screenshot(screenshot_path)
+                    # Wait for the filtered card instead of a fixed sleep
+                    self._wait_for_filter(
+                        driver, value, timeout=max(2, screenshot_delay)
+                    )
 
-                    if success:
-                        with self.lock:
-                            self.screenshots_taken += 1
+                    # Take screenshot via CDP on the persistent driver; either
+                    # queue it for the ffmpeg pipe or hand the disk write to
+                    # the I/O pool so this thread can move on to the next frame
+                    if not clip_ready:
+                        clip = self._card_clip(driver) if self.clip else None
+                        clip_ready = True
+
+                    img_bytes = self.cdp_screenshot(driver, clip=clip)
+                    if self.pipe:
+                        self._encode_queue.put((frame_num, img_bytes))
+                    else:
+                        screenshot_path = self._frame_files[frame_num]
+                        self._io_pool.submit(
+                            self._write_bytes, screenshot_path, img_bytes
+                        )
+
+                    with self.lock:
+                        self.screenshots_taken += 1
+                        if not self.pipe:
+                            self._frame_paths.append(screenshot_path)
 
                     frame_queue.task_done()
 
                 except Exception as e:
                     print(f"Error processing frame {frame_num}: {e}")
+                    if self.pipe and frame_num is not None:
+                        # Tell the pipe consumer not to wait for this frame
+                        self._encode_queue.put((frame_num, None))
                     frame_queue.task_done()
 
         except Exception as e:
@@ -162,7 +464,12 @@ class FrameCapture:
                 driver.quit()
 
     def capture_frames(
-        self, start_frame=43, max_frame=6571, delay_ms=200, screenshot_delay=0.5
+        self,
+        start_frame=43,
+        max_frame=6571,
+        delay_ms=200,
+        screenshot_delay=0.5,
+        finalize=True,
     ):
         """Main frame capture function with persistent browser instances"""
 
@@ -176,11 +483,61 @@ class FrameCapture:
         print(f"Range: frame_{start_frame:04d} to frame_{max_frame:04d}")
         print(f"Using {self.max_workers} persistent browser workers")
 
+        # Precompute filter strings and output paths once instead of
+        # re-formatting them in every worker iteration
+        self._frame_values = {
+            n: f"frame_{n:04d}" for n in range(start_frame, max_frame + 1)
+        }
+        self._frame_files = {
+            n: os.path.join(frames_dir, f"frame_{n:04d}.{self.image_ext}")
+            for n in range(start_frame, max_frame + 1)
+        }
+
         # Create queue and add all frame numbers
+        self._frame_paths = []
         frame_queue = Queue()
         for frame_num in range(start_frame, max_frame + 1):
             frame_queue.put(frame_num)
 
+        # Dedicated pool for disk writes so capture threads never block on I/O
+        self._io_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+
+        # In pipe mode, spawn ffmpeg up front and stream screenshots into its
+        # stdin as they arrive: no intermediate PNG files on disk at all
+        ffmpeg_proc = None
+        consumer = None
+        if self.pipe:
+            self._encode_queue = Queue()
+            ffmpeg_proc = subprocess.Popen(
+                [
+                    "ffmpeg",
+                    "-y",
+                    "-framerate",
+                    "30",
+                    "-f",
+                    "image2pipe",
+                    "-vcodec",
+                    "mjpeg" if self.image_format == "jpeg" else "png",
+                    "-i",
+                    "-",
+                    "-c:v",
+                    "libx264",
+                    "-preset",
+                    "ultrafast",
+                    "-pix_fmt",
+                    "yuv420p",
+                ]
+                + self._scale_args()
+                + [
+                    f"frames_{timestamp}.mp4",
+                ],
+                stdin=subprocess.PIPE,
+            )
+            consumer = threading.Thread(
+                target=self._pipe_consumer, args=(ffmpeg_proc, start_frame)
+            )
+            consumer.start()
+
         start_time = time.time()
 
         # Start worker threads
@@ -188,13 +545,19 @@ class FrameCapture:
         for i in range(self.max_workers):
             worker = threading.Thread(
                 target=self.capture_worker,
-                args=(frame_queue, frames_dir, screenshot_delay),
+                args=(frame_queue, screenshot_delay),
             )
             worker.start()
             workers.append(worker)
 
         # Monitor progress
-        with tqdm(total=total_frames, desc="Capturing frames", unit="frame") as pbar:
+        with tqdm(
+            total=total_frames,
+            desc="Capturing frames",
+            unit="frame",
+            mininterval=1.0,
+            smoothing=0.1,
+        ) as pbar:
             last_completed = 0
             while self.screenshots_taken < total_frames and any(
                 w.is_alive() for w in workers
@@ -223,45 +586,171 @@ class FrameCapture:
         for worker in workers:
             worker.join()
 
+        # Make sure every queued screenshot write has landed before ffmpeg
+        # goes looking for the files
+        self._io_pool.shutdown(wait=True)
+
         elapsed_total = time.time() - start_time
         print(f"\nScreenshot capture complete!")
         print(f"Successfully captured: {self.screenshots_taken}/{total_frames} frames")
         print(f"Total time: {elapsed_total:.1f} seconds")
         print(f"Average rate: {self.screenshots_taken / elapsed_total:.1f} fps")
 
-        # Compile into video with ffmpeg
-        print("Compiling frames into video...")
-        frame_files = glob.glob(os.path.join(frames_dir, "frame_*.png"))
-        if frame_files:
-            frame_numbers = [
-                int(os.path.basename(f).split("_")[1].split(".")[0])
-                for f in frame_files
-            ]
-            first_frame = min(frame_numbers)
-        else:
-            first_frame = start_frame
+        if self.pipe:
+            # Tell the consumer capture is over, then wait for the encode
+            self._encode_queue.put((None, None))
+            consumer.join()
+            ffmpeg_proc.wait()
+            print("Video encoded straight from the capture pipe.")
+            return frames_dir
+
+        # Shard workers (--procs) skip this and let the parent compile once
+        if finalize:
+            self.compile_video(frames_dir, timestamp, start_frame)
 
-        os.system(
-            f"ffmpeg -framerate 30 -start_number {first_frame} -i {frames_dir}/frame_%04d.png -c:v libx264 -pix_fmt yuv420p -vf scale=1920:1080 frames_{timestamp}.mp4"
+        return frames_dir
+
+    def capture_frames_screencast(self, start_frame=43, max_frame=6571):
+        """Experimental: stream frames via CDP Page.startScreencast.
+
+        Page.captureScreenshot pays a render + encode round-trip per
+        call; with a screencast Chrome pushes JPEG frames on its own as
+        the page repaints. Flip the tag filter, take the next pushed
+        frame, ack it, write it. Runs a single driver (the screencast
+        session is per-tab), so there is no worker fan-out here."""
+        import trio
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        frames_dir = "frames_rendered"
+        os.makedirs(frames_dir, exist_ok=True)
+
+        self._frame_paths = []
+        driver = self.setup_driver()
+        driver.get(self.url)
+        wait = WebDriverWait(driver, 10)
+        input_element = wait.until(
+            EC.presence_of_element_located(
+                (By.CSS_SELECTOR, 'input[placeholder="Filter tags (regex)"]')
+            )
         )
 
-        # Create zip archive
-        self.create_archive(frames_dir, f"frames_{timestamp}.zip")
+        set_filter = """
+            arguments[0].value = arguments[1];
+            arguments[0].dispatchEvent(new Event('input', { bubbles: true }));
+            arguments[0].dispatchEvent(new Event('change', { bubbles: true }));
+        """
+
+        async def run():
+            async with driver.bidi_connection() as conn:
+                session, devtools = conn.session, conn.devtools
+                await session.execute(devtools.page.enable())
+                frames = session.listen(devtools.page.ScreencastFrame)
+                await session.execute(
+                    devtools.page.start_screencast(
+                        format_=self.image_format, quality=85, every_nth_frame=1
+                    )
+                )
+
+                async def next_frame(timeout):
+                    event = None
+                    with trio.move_on_after(timeout):
+                        event = await frames.receive()
+                    if event is not None:
+                        # Unacked frames stall the screencast
+                        await session.execute(
+                            devtools.page.screencast_frame_ack(
+                                session_id=event.session_id
+                            )
+                        )
+                    return event
+
+                for frame_num in tqdm(
+                    range(start_frame, max_frame + 1),
+                    mininterval=1.0,
+                    smoothing=0.1,
+                ):
+                    value = f"frame_{frame_num:04d}"
+                    driver.execute_script(set_filter, input_element, value)
+                    self._wait_for_filter(driver, value)
+
+                    # Drain stale repaints, then take the fresh one
+                    while await next_frame(0.01) is not None:
+                        pass
+                    event = await next_frame(2)
+                    if event is None:
+                        print(f"No screencast frame for {value}, skipping")
+                        continue
+
+                    path = os.path.join(
+                        frames_dir, f"frame_{frame_num:04d}.{self.image_ext}"
+                    )
+                    self._write_bytes(path, base64.b64decode(event.data))
+                    self._frame_paths.append(path)
+                    self.screenshots_taken += 1
+
+                await session.execute(devtools.page.stop_screencast())
+
+        try:
+            trio.run(run)
+        finally:
+            driver.quit()
 
+        self.compile_video(frames_dir, timestamp, start_frame)
         return frames_dir
 
+    def compile_video(self, frames_dir, timestamp, start_frame=43):
+        """Compile captured frames into a video and archive them"""
+        print("Compiling frames into video...")
+        # Frames are dispatched in order, so the run starts at start_frame;
+        # no need to re-glob the directory to find the first file
+        first_frame = start_frame
+
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-y",
+                "-framerate",
+                "30",
+                "-start_number",
+                str(first_frame),
+                "-i",
+                f"{frames_dir}/frame_%04d.{self.image_ext}",
+                "-c:v",
+                "libx264",
+                "-preset",
+                "ultrafast",
+                "-pix_fmt",
+                "yuv420p",
+            ]
+            + self._scale_args()
+            + [
+                f"frames_{timestamp}.mp4",
+            ],
+            check=True,
+        )
+
+        # The mp4 is the deliverable; only zip the frames on request
+        if self.archive:
+            self.create_archive(frames_dir, f"frames_{timestamp}.zip")
+
     def create_archive(self, frames_dir, zip_name):
         """Create zip archive of all screenshots"""
         print(f"Creating zip archive: {zip_name}")
 
-        with zipfile.ZipFile(
-            zip_name, "w", zipfile.ZIP_DEFLATED, compresslevel=6
-        ) as zipf:
-            for root, dirs, files in os.walk(frames_dir):
-                for file in files:
-                    if file.endswith(".png"):
-                        file_path = os.path.join(root, file)
-                        zipf.write(file_path, file)
+        # PNG/JPEG payloads are already compressed, so a second DEFLATE
+        # pass burns CPU for near-zero size gain — just store them
+        with zipfile.ZipFile(zip_name, "w", zipfile.ZIP_STORED) as zipf:
+            if self._frame_paths:
+                # Capture already knows every path it wrote, so skip the
+                # stat/readdir pass over thousands of files
+                for path in self._frame_paths:
+                    zipf.write(path, os.path.basename(path))
+            else:
+                # Fallback for frames written elsewhere (--procs shards)
+                with os.scandir(frames_dir) as entries:
+                    for entry in entries:
+                        if entry.name.endswith((".png", ".jpg")):
+                            zipf.write(entry.path, entry.name)
 
         # Get file size
         zip_size = os.path.getsize(zip_name) / (1024 * 1024)  # MB
@@ -273,6 +762,26 @@ class FrameCapture:
         print("Individual frame files removed.")
 
 
+def _capture_shard(url, window_size, start, end, screenshot_delay, png, clip):
+    """Capture one contiguous shard of frames in its own process.
+
+    Module-level so ProcessPoolExecutor can pickle it; each shard gets
+    its own Chrome instance and skips finalization so the parent can run
+    ffmpeg/zip once over the shared frames directory."""
+    capturer = FrameCapture(
+        url,
+        headless=True,
+        window_size=window_size,
+        max_workers=1,
+        pipe=False,  # Shards write files; the parent encodes once
+        png=png,
+        clip=clip,
+    )
+    return capturer.capture_frames(
+        start, end, screenshot_delay=screenshot_delay, finalize=False
+    )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Capture frames using Selenium")
     parser.add_argument(
@@ -289,17 +798,129 @@ def main():
         default=0.5,
         help="Delay before screenshot (seconds)",
     )
-    parser.add_argument("--headless", action="store_true", help="Run in headless mode")
+    parser.add_argument(
+        "--no-headless",
+        action="store_true",
+        help="Run with a visible browser window (headless is the default)",
+    )
     parser.add_argument(
         "--window-size", default="1920,1080", help="Browser window size"
     )
     parser.add_argument(
         "--workers", type=int, default=8, help="Number of concurrent workers"
     )
+    parser.add_argument(
+        "--procs",
+        type=int,
+        default=1,
+        help="Shard the frame range across this many capture processes, "
+        "each with its own Chrome instance",
+    )
+    parser.add_argument(
+        "--scrape",
+        action="store_true",
+        help="Scrape TensorBoard's scalar JSON API and render with matplotlib "
+        "instead of screenshotting the browser",
+    )
+    parser.add_argument(
+        "--no-pipe",
+        action="store_true",
+        help="Write image files to disk and compile afterwards instead of "
+        "streaming screenshots straight into ffmpeg stdin",
+    )
+    parser.add_argument(
+        "--png",
+        action="store_true",
+        help="Capture lossless PNG screenshots instead of JPEG (slower)",
+    )
+    parser.add_argument(
+        "--screencast",
+        action="store_true",
+        help="Experimental: stream frames via CDP Page.startScreencast "
+        "with a single browser instead of per-frame screenshots",
+    )
+    parser.add_argument(
+        "--archive",
+        action="store_true",
+        help="Zip the captured frame files after compiling the video "
+        "(only applies with --no-pipe)",
+    )
+    parser.add_argument(
+        "--no-clip",
+        action="store_true",
+        help="Screenshot the full viewport instead of clipping to the "
+        "dashboard card",
+    )
 
     args = parser.parse_args()
 
-    capturer = FrameCapture(args.url, args.headless, args.window_size, args.workers)
+    if args.scrape:
+        capturer = ScalarScrapeCapture(args.url, max_workers=args.workers)
+        capturer.capture_frames(args.start, args.end)
+        return
+
+    if args.screencast:
+        capturer = FrameCapture(
+            args.url,
+            not args.no_headless,
+            args.window_size,
+            png=args.png,
+            archive=args.archive,
+            clip=False,  # Screencast frames are always full-viewport
+        )
+        capturer.capture_frames_screencast(args.start, args.end)
+        return
+
+    if args.procs > 1:
+        # Shard the range into contiguous chunks, one Chrome per process;
+        # the executor's worker cap already bounds concurrency
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        total = args.end - args.start + 1
+        n = min(args.procs, total)
+        size = -(-total // n)  # Ceil division
+        shards = [
+            (args.start + i * size, min(args.start + (i + 1) * size - 1, args.end))
+            for i in range(n)
+        ]
+        print(f"Sharding {total} frames across {n} capture processes")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=n) as pool:
+            futures = [
+                pool.submit(
+                    _capture_shard,
+                    args.url,
+                    args.window_size,
+                    shard_start,
+                    shard_end,
+                    args.screenshot_delay,
+                    args.png,
+                    not args.no_clip,
+                )
+                for shard_start, shard_end in shards
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                future.result()
+
+        # Compile/archive once in the parent over the shared frames dir
+        capturer = FrameCapture(
+            args.url,
+            window_size=args.window_size,
+            png=args.png,
+            archive=args.archive,
+            clip=not args.no_clip,
+        )
+        capturer.compile_video("frames_rendered", timestamp, args.start)
+        return
+
+    capturer = FrameCapture(
+        args.url,
+        not args.no_headless,
+        args.window_size,
+        args.workers,
+        pipe=not args.no_pipe,
+        png=args.png,
+        archive=args.archive,
+        clip=not args.no_clip,
+    )
     capturer.capture_frames(args.start, args.end, args.delay, args.screenshot_delay)
 
 